@@ -1,122 +1,214 @@
 # billing_app.py
 import csv
+import io
 import os
+import shutil
 import webbrowser
-from decimal import Decimal, ROUND_HALF_UP
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from string import Template
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog, filedialog
 
 # ---------- Config ----------
 PRODUCTS_CSV = "products.csv"
 INVOICES_DIR = "invoices"
+INVOICE_COUNTER = os.path.join(INVOICES_DIR, ".counter")  # last used invoice number
 GST_DEFAULT = Decimal("18.0")  # percent
-CURRENCY_QUANT = Decimal("0.01")
+IO_BUFFER = 1 << 20  # bytes
+TOTALS_DEBOUNCE_MS = 120
 # ----------------------------
 
-def money(d: Decimal) -> str:
-    return f"{d.quantize(CURRENCY_QUANT, rounding=ROUND_HALF_UP)}"
+# parsed once at import; save_invoice_html writes head, rows and foot straight to the file
+INVOICE_HTML_HEAD = Template("""
+    <html>
+    <head><meta charset="utf-8"><title>Invoice $inv_number</title></head>
+    <body>
+    <h2>Invoice #$inv_number</h2>
+    <p>Date: $date</p>
+    <p>Customer: $customer_name</p>
+    <table border="1" cellspacing="0" cellpadding="6" width="80%">
+      <thead>
+        <tr><th>Code</th><th>Item</th><th>Price</th><th>Qty</th><th>Line Total</th></tr>
+      </thead>
+      <tbody>
+      """)
+INVOICE_HTML_FOOT = Template("""
+      </tbody>
+    </table>
+    <p>Subtotal: <b>$subtotal</b></p>
+    <p>GST ($gst_percent%): <b>$gst_total</b> (CGST $cgst + SGST $sgst)</p>
+    <h3>Grand Total: $grand_total</h3>
+    <hr>
+    <p>Thank you for your business!</p>
+    </body>
+    </html>
+    """)
+INVOICE_ROW = "<tr><td>%s</td><td>%s</td><td align='right'>%s</td><td align='center'>%d</td><td align='right'>%s</td></tr>\n"
+
+def money(c: int) -> str:
+    # amounts are kept as int cents; only format them for display/persist
+    sign = "-" if c < 0 else ""
+    q, r = divmod(abs(c), 100)
+    return f"{sign}{q}.{r:02d}"
+
+def div_half_up(n: int, d: int) -> int:
+    # n / d rounded half away from zero, like Decimal ROUND_HALF_UP
+    q = (abs(n) * 2 + d) // (d * 2)
+    return -q if n < 0 else q
+
+def to_cents(d: Decimal) -> int:
+    return int((d * 100).to_integral_value(rounding=ROUND_HALF_UP))
+
+def parse_cents(price: str) -> int:
+    # fast exact path for plain "123" / "123.4" / "123.45"; Decimal for anything else
+    whole, _, frac = price.partition(".")
+    if whole.isdecimal() and len(frac) <= 2 and (not frac or frac.isdecimal()):
+        return int(whole) * 100 + int(frac.ljust(2, "0"))
+    try:
+        return to_cents(Decimal(price))
+    except (ArithmeticError, ValueError):
+        return 0
+
+def column_indexes(header, *names):
+    # indexes of the names present in the header row, in order of preference
+    return [header.index(name) for name in names if name in header]
 
 def read_products(path=PRODUCTS_CSV):
     products = {}
     if not os.path.exists(path):
         return products
-    with open(path, newline='', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for r in reader:
-            code = r.get("code") or r.get("id") or r.get("sku")
-            name = r.get("name") or r.get("product") or ""
-            price = r.get("price") or "0"
+    # large read buffer + plain csv.reader (no per-row dict)
+    with open(path, newline='', encoding='utf-8', buffering=IO_BUFFER) as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header:
+            return products
+        code_cols = column_indexes(header, "code", "id", "sku")
+        name_cols = column_indexes(header, "name", "product")
+        price_cols = column_indexes(header, "price")
+        if not code_cols:
+            return products
+        for row in reader:
+            # first non-empty candidate column per row
+            n = len(row)
+            code = next((row[i] for i in code_cols if i < n and row[i]), "")
             if not code:
                 continue
-            try:
-                price_d = Decimal(price)
-            except:
-                price_d = Decimal("0")
-            products[code] = {"name": name, "price": price_d}
+            name = next((row[i] for i in name_cols if i < n and row[i]), "")
+            price = next((row[i] for i in price_cols if i < n and row[i]), "0")
+            price_cents = parse_cents(price)
+            products[code] = {"name": name, "price_cents": price_cents, "price_str": money(price_cents)}
     return products
 
 def ensure_invoices_dir():
     os.makedirs(INVOICES_DIR, exist_ok=True)
 
+def last_invoice_number():
+    # slow path: scan saved invoices, only used when the counter file is missing
+    best = 0
+    with os.scandir(INVOICES_DIR) as it:
+        for entry in it:
+            fname = entry.name
+            if fname.startswith("invoice_") and fname.endswith(".csv"):
+                try:
+                    n = int(fname[8:-4])
+                except ValueError:
+                    continue
+                if n > best:
+                    best = n
+    return best
+
 def next_invoice_number():
     ensure_invoices_dir()
-    nums = []
-    for fname in os.listdir(INVOICES_DIR):
-        if fname.startswith("invoice_") and fname.endswith(".csv"):
-            try:
-                n = int(fname.split("_")[1].split(".")[0])
-                nums.append(n)
-            except:
-                pass
-    return max(nums + [0]) + 1
+    try:
+        with open(INVOICE_COUNTER, encoding='utf-8') as f:
+            n = int(f.read())
+    except (OSError, ValueError):
+        n = last_invoice_number()
+    n += 1
+    # the counter may lag the files (restored backup, synced folder); never reuse a saved number
+    while os.path.exists(os.path.join(INVOICES_DIR, f"invoice_{n}.csv")):
+        n += 1
+    with open(INVOICE_COUNTER, "w", encoding='utf-8') as f:
+        f.write(str(n))
+    return n
 
 def save_invoice_csv(inv_number, invoice_data, filename=None):
     ensure_invoices_dir()
     if filename is None:
         filename = os.path.join(INVOICES_DIR, f"invoice_{inv_number}.csv")
+    # build in memory and write once
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(["invoice_number", inv_number])
+    writer.writerow(["date", invoice_data["date"]])
+    writer.writerow(["customer_name", invoice_data.get("customer_name","")])
+    writer.writerow([])
+    writer.writerow(["code","name","price","qty","total"])
+    writer.writerows([row["code"], row["name"], row["price_str"], row["qty"], row["line_total_str"]] for row in invoice_data["items"])
+    writer.writerow([])
+    writer.writerow(["subtotal", money(invoice_data["subtotal"])])
+    writer.writerow(["gst_percent", str(invoice_data["gst_percent"])])
+    writer.writerow(["gst_total", money(invoice_data["gst_total"])])
+    writer.writerow(["cgst", money(invoice_data["cgst"])])
+    writer.writerow(["sgst", money(invoice_data["sgst"])])
+    writer.writerow(["grand_total", money(invoice_data["grand_total"])])
     with open(filename, "w", newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(["invoice_number", inv_number])
-        writer.writerow(["date", invoice_data["date"]])
-        writer.writerow(["customer_name", invoice_data.get("customer_name","")])
-        writer.writerow([])
-        writer.writerow(["code","name","price","qty","total"])
-        for row in invoice_data["items"]:
-            writer.writerow([row["code"], row["name"], money(row["price"]), row["qty"], money(row["line_total"])])
-        writer.writerow([])
-        writer.writerow(["subtotal", money(invoice_data["subtotal"])])
-        writer.writerow(["gst_percent", str(invoice_data["gst_percent"])])
-        writer.writerow(["gst_total", money(invoice_data["gst_total"])])
-        writer.writerow(["cgst", money(invoice_data["cgst"])])
-        writer.writerow(["sgst", money(invoice_data["sgst"])])
-        writer.writerow(["grand_total", money(invoice_data["grand_total"])])
+        f.write(buf.getvalue())
     return filename
 
 def save_invoice_html(inv_number, invoice_data, filename=None):
     ensure_invoices_dir()
     if filename is None:
         filename = os.path.join(INVOICES_DIR, f"invoice_{inv_number}.html")
-    rows_html = ""
-    for row in invoice_data["items"]:
-        rows_html += f"<tr><td>{row['code']}</td><td>{row['name']}</td><td align='right'>{money(row['price'])}</td><td align='center'>{row['qty']}</td><td align='right'>{money(row['line_total'])}</td></tr>\n"
-    html = f"""
-    <html>
-    <head><meta charset="utf-8"><title>Invoice {inv_number}</title></head>
-    <body>
-    <h2>Invoice #{inv_number}</h2>
-    <p>Date: {invoice_data['date']}</p>
-    <p>Customer: {invoice_data.get('customer_name','-')}</p>
-    <table border="1" cellspacing="0" cellpadding="6" width="80%">
-      <thead>
-        <tr><th>Code</th><th>Item</th><th>Price</th><th>Qty</th><th>Line Total</th></tr>
-      </thead>
-      <tbody>
-      {rows_html}
-      </tbody>
-    </table>
-    <p>Subtotal: <b>{money(invoice_data['subtotal'])}</b></p>
-    <p>GST ({invoice_data['gst_percent']}%): <b>{money(invoice_data['gst_total'])}</b> (CGST {money(invoice_data['cgst'])} + SGST {money(invoice_data['sgst'])})</p>
-    <h3>Grand Total: {money(invoice_data['grand_total'])}</h3>
-    <hr>
-    <p>Thank you for your business!</p>
-    </body>
-    </html>
-    """
-    with open(filename, "w", encoding='utf-8') as f:
-        f.write(html)
+    with open(filename, "w", encoding='utf-8', buffering=IO_BUFFER) as f:
+        f.write(INVOICE_HTML_HEAD.substitute(
+            inv_number=inv_number,
+            date=invoice_data['date'],
+            customer_name=invoice_data.get('customer_name','-'),
+        ))
+        write = f.write
+        for row in invoice_data["items"]:
+            write(INVOICE_ROW % (row['code'], row['name'], row['price_str'], row['qty'], row['line_total_str']))
+        f.write(INVOICE_HTML_FOOT.substitute(
+            subtotal=money(invoice_data['subtotal']),
+            gst_percent=invoice_data['gst_percent'],
+            gst_total=money(invoice_data['gst_total']),
+            cgst=money(invoice_data['cgst']),
+            sgst=money(invoice_data['sgst']),
+            grand_total=money(invoice_data['grand_total']),
+        ))
     return filename
 
+def save_invoice(inv_number, invoice_data):
+    return save_invoice_csv(inv_number, invoice_data), save_invoice_html(inv_number, invoice_data)
+
+def import_products(path):
+    # parse the source first so a bad file never replaces the working products.csv,
+    # then copy/replace the local file (streamed, not held in memory)
+    products = read_products(path)
+    if not (os.path.exists(PRODUCTS_CSV) and os.path.samefile(path, PRODUCTS_CSV)):
+        with open(path, "rb") as src, open(PRODUCTS_CSV, "wb") as dst:
+            shutil.copyfileobj(src, dst, IO_BUFFER)
+    return products
+
 class BillingApp(tk.Tk):
     def __init__(self):
         super().__init__()
         self.title("Billing Software")
         self.geometry("900x600")
-        self.products = read_products()
+        self.set_products(read_products())
         if not self.products:
             messagebox.showinfo("No products", f"No products found in {PRODUCTS_CSV}. Please create the file and restart.")
-        self.cart = []  # list of dicts {code,name,price,qty,line_total}
+        self.cart = {}  # code -> dict {code,name,price_cents,price_str,qty,line_total_cents,line_total_str}, in insertion order
         self.gst_percent = GST_DEFAULT
+        self._cart_version = 0  # bumped on every cart mutation
+        self._last_totals_key = None
+        self._io_pool = ThreadPoolExecutor(max_workers=2)
+        self._invoice_pending = False
+        self._import_pending = False
 
         self.create_ui()
         self.refresh_product_list()
@@ -128,9 +220,20 @@ class BillingApp(tk.Tk):
         left.pack(side=tk.LEFT, fill=tk.Y, padx=10, pady=10)
 
         tk.Label(left, text="Products").pack(anchor="w")
-        self.product_listbox = tk.Listbox(left, width=40, height=20)
-        self.product_listbox.pack()
+        list_frame = tk.Frame(left)
+        list_frame.pack(anchor="w")
+        # the listbox only ever holds the visible rows; the scrollbar is driven
+        # by _scroll_products over the full self._product_display list
+        self.product_listbox = tk.Listbox(list_frame, width=40, height=20)
+        self.product_listbox.pack(side=tk.LEFT)
         self.product_listbox.bind("<Double-Button-1>", lambda e: self.add_selected_product())
+        self.product_scroll = tk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self._scroll_products)
+        self.product_scroll.pack(side=tk.LEFT, fill=tk.Y)
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.product_listbox.bind(seq, self._on_product_wheel)
+        for seq in ("<Up>", "<Down>", "<Prior>", "<Next>"):
+            self.product_listbox.bind(seq, self._on_product_key)
+        self.product_listbox.bind("<<ListboxSelect>>", self._on_product_select)
 
         qty_frame = tk.Frame(left)
         qty_frame.pack(pady=6, anchor="w")
@@ -170,6 +273,8 @@ class BillingApp(tk.Tk):
 
         tk.Label(bottom, text="GST %:").grid(row=1, column=0, sticky="e")
         self.gst_var = tk.StringVar(value=str(self.gst_percent))
+        self._totals_after_id = None
+        self.gst_var.trace_add("write", lambda *_: self._schedule_totals())
         tk.Entry(bottom, textvariable=self.gst_var, width=8).grid(row=1, column=1, sticky="w")
 
         self.subtotal_label = tk.Label(bottom, text="Subtotal: 0.00")
@@ -185,19 +290,84 @@ class BillingApp(tk.Tk):
         tk.Button(actions, text="Export cart CSV", command=self.export_cart_csv).pack(side=tk.LEFT, padx=6)
         tk.Button(actions, text="Open invoices folder", command=self.open_invoices_folder).pack(side=tk.LEFT, padx=6)
 
+    def set_products(self, products):
+        # sort and format once per catalog load, not on every list refresh
+        self.products = products
+        self._sorted_codes = sorted(products)  # parallel to _product_display
+        self._product_display = [f"{code} | {products[code]['name']} | {products[code]['price_str']}" for code in self._sorted_codes]
+
     def refresh_product_list(self):
+        # new catalog: drop the old selection and force a rebuild
+        self._product_first = None
+        self._product_selected = None
+        self._populate_window(0)
+
+    def _populate_window(self, first):
+        rows = self._product_display
+        visible = int(self.product_listbox.cget("height"))
+        first = max(0, min(first, len(rows) - visible))
+        if first == self._product_first:
+            return
+        self._product_first = first
         self.product_listbox.delete(0, tk.END)
-        for code, p in sorted(self.products.items()):
-            self.product_listbox.insert(tk.END, f"{code} | {p['name']} | {money(p['price'])}")
+        window = rows[first:first + visible]
+        if window:
+            self.product_listbox.insert(tk.END, *window)
+        total = len(rows) or 1
+        self.product_scroll.set(first / total, min(1.0, (first + visible) / total))
+        # rebuilding clears the listbox selection; restore it if still in view
+        sel = self._product_selected
+        if sel is not None and first <= sel < first + visible:
+            self.product_listbox.selection_set(sel - first)
+            self.product_listbox.activate(sel - first)
 
-    def add_selected_product(self):
+    def _on_product_select(self, event):
+        # remember the selection as an index into the full list, not the window
         sel = self.product_listbox.curselection()
-        if not sel:
+        self._product_selected = self._product_first + sel[0] if sel else None
+
+    def _scroll_products(self, action, amount, unit=None):
+        if action == "moveto":
+            first = int(float(amount) * len(self._product_display))
+        else:
+            step = int(self.product_listbox.cget("height")) if unit == "pages" else 1
+            first = self._product_first + int(amount) * step
+        self._populate_window(first)
+
+    def _on_product_wheel(self, event):
+        direction = -1 if (event.num == 4 or event.delta > 0) else 1
+        self._scroll_products("scroll", direction * 3, "units")
+        return "break"
+
+    def _on_product_key(self, event):
+        # move the selection over the full list, shifting the window at its edges
+        rows = len(self._product_display)
+        if not rows:
+            return "break"
+        visible = int(self.product_listbox.cget("height"))
+        step = {"Up": -1, "Down": 1, "Prior": -visible, "Next": visible}[event.keysym]
+        current = self._product_selected
+        if current is None:
+            current = self._product_first + self.product_listbox.index(tk.ACTIVE)
+        target = max(0, min(current + step, rows - 1))
+        self._product_selected = target
+        if target < self._product_first:
+            self._scroll_products("scroll", target - self._product_first, "units")
+        elif target >= self._product_first + visible:
+            self._scroll_products("scroll", target - (self._product_first + visible - 1), "units")
+        i = target - self._product_first
+        self.product_listbox.selection_clear(0, tk.END)
+        self.product_listbox.selection_set(i)
+        self.product_listbox.activate(i)
+        self.product_listbox.see(i)
+        return "break"
+
+    def add_selected_product(self):
+        if self._product_selected is None:
             messagebox.showwarning("Select product", "Please select a product from the list (double-click works).")
             return
-        idx = sel[0]
-        line = self.product_listbox.get(idx)
-        code = line.split("|")[0].strip()
+        # _product_selected indexes the full list, so it survives scrolling
+        code = self._sorted_codes[self._product_selected]
         prod = self.products.get(code)
         if not prod:
             return
@@ -205,61 +375,77 @@ class BillingApp(tk.Tk):
         if qty <= 0:
             messagebox.showwarning("Quantity", "Enter quantity >= 1")
             return
-        price = prod["price"]
-        line_total = (price * Decimal(qty)).quantize(CURRENCY_QUANT, rounding=ROUND_HALF_UP)
+        price_cents = prod["price_cents"]
         # if already in cart, increment qty
-        found = False
-        for item in self.cart:
-            if item["code"] == code:
-                item["qty"] += qty
-                item["line_total"] = (item["price"] * Decimal(item["qty"])).quantize(CURRENCY_QUANT, rounding=ROUND_HALF_UP)
-                found = True
-                break
-        if not found:
-            self.cart.append({"code": code, "name": prod["name"], "price": price, "qty": qty, "line_total": line_total})
-        self.refresh_cart()
+        item = self.cart.get(code)
+        if item:
+            item["qty"] += qty
+            item["line_total_cents"] = item["price_cents"] * item["qty"]
+            item["line_total_str"] = money(item["line_total_cents"])
+        else:
+            item = self.cart[code] = {"code": code, "name": prod["name"], "price_cents": price_cents, "price_str": prod["price_str"],
+                                      "qty": qty, "line_total_cents": price_cents * qty, "line_total_str": money(price_cents * qty)}
+        self._upsert_row(item)
+        self._cart_version += 1
         self.update_totals()
 
     def refresh_cart(self):
-        for i in self.tree.get_children():
-            self.tree.delete(i)
-        for item in self.cart:
-            self.tree.insert("", tk.END, values=(item["code"], item["name"], money(item["price"]), item["qty"], money(item["line_total"])))
+        # full rebuild; single add/remove go through _upsert_row/_delete_row
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+        # tree is empty now, so insert directly without the exists() probe
+        for item in self.cart.values():
+            self.tree.insert("", tk.END, iid=item["code"], values=self._cart_row_values(item))
+
+    def _cart_row_values(self, item):
+        return (item["code"], item["name"], item["price_str"], item["qty"], item["line_total_str"])
+
+    def _upsert_row(self, item):
+        # tree rows use the product code as iid
+        code = item["code"]
+        if self.tree.exists(code):
+            self.tree.item(code, values=self._cart_row_values(item))
+        else:
+            self.tree.insert("", tk.END, iid=code, values=self._cart_row_values(item))
+
+    def _delete_row(self, code):
+        if self.tree.exists(code):
+            self.tree.delete(code)
 
     def remove_selected(self):
         sel = self.tree.selection()
         if not sel:
             return
-        for s in sel:
-            vals = self.tree.item(s, "values")
-            code = vals[0]
-            # remove from cart (first occurrence)
-            for i, it in enumerate(self.cart):
-                if it["code"] == code:
-                    del self.cart[i]
-                    break
-        self.refresh_cart()
+        for code in sel:
+            self.cart.pop(code, None)
+            self._delete_row(code)
+        self._cart_version += 1
         self.update_totals()
 
     def clear_cart(self):
         if messagebox.askyesno("Clear", "Clear the cart?"):
-            self.cart = []
+            self.cart = {}
+            self._cart_version += 1
             self.refresh_cart()
             self.update_totals()
 
     def update_totals(self):
-        subtotal = Decimal("0")
-        for it in self.cart:
-            subtotal += it["line_total"]
+        # nothing to do if neither the cart nor the GST text changed since last time
+        if (self._cart_version, self.gst_var.get()) == self._last_totals_key:
+            return
+        # all amounts in int cents; GST percent in basis points
+        subtotal = sum(it["line_total_cents"] for it in self.cart.values())
         try:
-            gst_percent = Decimal(self.gst_var.get())
+            gst_bp = to_cents(Decimal(self.gst_var.get()))
         except:
-            gst_percent = GST_DEFAULT
-            self.gst_var.set(str(gst_percent))
-        gst_total = (subtotal * gst_percent / Decimal("100")).quantize(CURRENCY_QUANT, rounding=ROUND_HALF_UP)
-        cgst = (gst_total / 2).quantize(CURRENCY_QUANT, rounding=ROUND_HALF_UP)
-        sgst = gst_total - cgst  # safe split
-        grand_total = (subtotal + gst_total).quantize(CURRENCY_QUANT, rounding=ROUND_HALF_UP)
+            gst_bp = to_cents(GST_DEFAULT)
+            self.gst_var.set(str(GST_DEFAULT))
+        gst_total = div_half_up(subtotal * gst_bp, 10000)
+        # halve in int cents; CGST takes the odd cent, as the old ROUND_HALF_UP split did
+        cgst = div_half_up(gst_total, 2)
+        sgst = gst_total - cgst
+        grand_total = subtotal + gst_total
         self.subtotal = subtotal
         self.gst_total = gst_total
         self.cgst = cgst
@@ -269,18 +455,41 @@ class BillingApp(tk.Tk):
         self.subtotal_label.config(text=f"Subtotal: {money(subtotal)}")
         self.gst_label.config(text=f"GST: {money(gst_total)} ({money(cgst)} CGST + {money(sgst)} SGST)")
         self.grand_label.config(text=f"Grand Total: {money(grand_total)}")
+        self._last_totals_key = (self._cart_version, self.gst_var.get())
+
+    def _schedule_totals(self):
+        # debounce GST edits so a burst of keystrokes recomputes totals once
+        if self._totals_after_id:
+            self.after_cancel(self._totals_after_id)
+        self._totals_after_id = self.after(TOTALS_DEBOUNCE_MS, self._apply_gst)
+
+    def _apply_gst(self):
+        self._totals_after_id = None
+        try:
+            Decimal(self.gst_var.get())
+        except InvalidOperation:
+            return  # still being typed; don't reset the field to the default
+        self.update_totals()
 
     def generate_invoice(self):
         if not self.cart:
             messagebox.showwarning("Empty cart", "Add items before generating an invoice.")
             return
+        if self._invoice_pending:
+            return
+        # flush a pending debounced GST edit so the saved percent matches the totals;
+        # update_totals also replaces unfinished GST text with the default
+        if self._totals_after_id:
+            self.after_cancel(self._totals_after_id)
+            self._totals_after_id = None
+        self.update_totals()
         inv_num = next_invoice_number()
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         customer = self.customer_entry.get().strip()
         invoice_data = {
             "date": now,
             "customer_name": customer,
-            "items": self.cart,
+            "items": [dict(it) for it in self.cart.values()],  # snapshot for the worker thread
             "subtotal": self.subtotal,
             "gst_percent": str(self.gst_var.get()),
             "gst_total": self.gst_total,
@@ -288,15 +497,27 @@ class BillingApp(tk.Tk):
             "sgst": self.sgst,
             "grand_total": self.grand_total
         }
-        csvfile = save_invoice_csv(inv_num, invoice_data)
-        htmlfile = save_invoice_html(inv_num, invoice_data)
+        self._invoice_pending = True
+        cart_version = self._cart_version
+        self.run_in_background(lambda: save_invoice(inv_num, invoice_data),
+                               lambda fut: self._on_invoice_saved(fut, inv_num, cart_version))
+
+    def _on_invoice_saved(self, fut, inv_num, cart_version):
+        self._invoice_pending = False
+        try:
+            csvfile, htmlfile = fut.result()
+        except Exception as e:
+            messagebox.showerror("Error", str(e))
+            return
         messagebox.showinfo("Saved", f"Invoice #{inv_num} saved.\nCSV: {csvfile}\nHTML: {htmlfile}")
         # open the html in default browser for print/preview
         webbrowser.open_new_tab(os.path.abspath(htmlfile))
-        # reset cart
-        self.cart = []
-        self.refresh_cart()
-        self.update_totals()
+        # reset cart, unless it was edited while the files were being written
+        if self._cart_version == cart_version:
+            self.cart = {}
+            self._cart_version += 1
+            self.refresh_cart()
+            self.update_totals()
 
     def export_cart_csv(self):
         if not self.cart:
@@ -308,8 +529,8 @@ class BillingApp(tk.Tk):
         with open(path, "w", newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
             writer.writerow(["code","name","price","qty","total"])
-            for it in self.cart:
-                writer.writerow([it["code"], it["name"], money(it["price"]), it["qty"], money(it["line_total"])])
+            for it in self.cart.values():
+                writer.writerow([it["code"], it["name"], it["price_str"], it["qty"], it["line_total_str"]])
         messagebox.showinfo("Exported", f"Cart exported to {path}")
 
     def open_invoices_folder(self):
@@ -325,20 +546,30 @@ class BillingApp(tk.Tk):
                 messagebox.showinfo("Invoices folder", path)
 
     def load_products_csv(self):
+        if self._import_pending:
+            return
         path = filedialog.askopenfilename(title="Select products CSV", filetypes=[("CSV files","*.csv")])
         if not path:
             return
-        # copy/replace local products file
+        self._import_pending = True
+        self.run_in_background(lambda: import_products(path),
+                               lambda fut: self._on_products_loaded(fut, path))
+
+    def _on_products_loaded(self, fut, path):
+        self._import_pending = False
         try:
-            with open(path, newline='', encoding='utf-8') as src:
-                txt = src.read()
-            with open(PRODUCTS_CSV, "w", newline='', encoding='utf-8') as dst:
-                dst.write(txt)
-            self.products = read_products()
-            self.refresh_product_list()
-            messagebox.showinfo("Loaded", f"Products loaded from {path} into {PRODUCTS_CSV}")
+            products = fut.result()
         except Exception as e:
             messagebox.showerror("Error", str(e))
+            return
+        self.set_products(products)
+        self.refresh_product_list()
+        messagebox.showinfo("Loaded", f"Products loaded from {path} into {PRODUCTS_CSV}")
+
+    def run_in_background(self, work, on_done):
+        # run blocking file I/O on the pool; on_done(future) is called back on the Tk thread
+        fut = self._io_pool.submit(work)
+        fut.add_done_callback(lambda f: self.after(0, on_done, f))
 
 if __name__ == "__main__":
     app = BillingApp()